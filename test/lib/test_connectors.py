@@ -26,7 +26,7 @@ class RevConnect(Elaboratable):
         return self.connect
 
 
-FIFO_Like: TypeAlias = FIFO | Forwarder | Connect | RevConnect | Pipe
+FIFO_Like: TypeAlias = FIFO | Forwarder | Connect | RevConnect | Pipe | SpillRegister
 
 
 class TestFifoBase(TestCaseWithSimulator):
@@ -120,6 +120,12 @@ class TestPipe(TestFifoBase):
         self.do_test_fifo(Pipe, writer_rand=0, reader_rand=0)
 
 
+class TestSpillRegister(TestFifoBase):
+    @pytest.mark.parametrize("writer_rand, reader_rand", [(0, 0), (2, 0), (0, 2), (1, 1)])
+    def test_fifo(self, writer_rand, reader_rand):
+        self.do_test_fifo(SpillRegister, writer_rand=writer_rand, reader_rand=reader_rand)
+
+
 class TestCrossbarConnectTrans(TestCaseWithSimulator):
     def initialize(self):
         f1_size = 14
@@ -3,10 +3,10 @@ import pytest
 from amaranth import *
 from amaranth.lib import data
 
-from transactron.lib.fifo import BasicFifo, WideFifo
+from transactron.lib.fifo import BasicFifo, WideFifo, Semaphore
 from transactron.utils.amaranth_ext import const_of
 
-from transactron.testing import TestCaseWithSimulator, data_layout, TestbenchContext, SimpleTestCircuit
+from transactron.testing import TestCaseWithSimulator, data_layout, TestbenchContext, SimpleTestCircuit, CallTrigger
 from collections import deque
 import random
 
@@ -136,3 +136,36 @@ class TestWideFifo(TestCaseWithSimulator):
             sim.add_testbench(self.target)
             sim.add_testbench(self.peek_verifier)
             sim.add_testbench(self.idx_verifier)
+
+
+class TestSemaphore(TestCaseWithSimulator):
+    @pytest.mark.parametrize("max_count", [1, 4, 5])
+    def test_randomized(self, max_count: int):
+        random.seed(42)
+        circ = SimpleTestCircuit(Semaphore(max_count))
+
+        async def process(sim: TestbenchContext):
+            count = 0
+            for _ in range(200):
+                do_acquire = random.random() < 0.6
+                do_release = random.random() < 0.5
+                do_clear = random.random() < 0.05
+
+                trigger = CallTrigger(sim)
+                if do_acquire:
+                    trigger = trigger.call(circ.acquire)
+                if do_release:
+                    trigger = trigger.call(circ.release)
+                if do_clear:
+                    trigger = trigger.call(circ.clear)
+                results = iter(await trigger)
+
+                acquired = do_acquire and next(results) is not None
+                released = do_release and next(results) is not None
+                assert acquired == (do_acquire and count < max_count)
+                assert released == (do_release and count > 0)
+
+                count = 0 if do_clear else count + acquired - released
+
+        with self.run_simulation(circ) as sim:
+            sim.add_testbench(process)
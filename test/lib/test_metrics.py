@@ -214,6 +214,10 @@ class TestTaggedCounter(TestCaseWithSimulator):
         values = [-2137, 2, 4, 8, 42]
         self.do_test_enum(values, values, ways)
 
+    def test_sparse_one_hot_list(self, ways):
+        values = [1, 4, 32]
+        self.do_test_enum(values, values, ways)
+
 
 class ExpHistogramCircuit(Elaboratable):
     def __init__(self, bucket_cnt: int, sample_width: int):
@@ -547,6 +551,25 @@ class TestMetricsManager(TestCaseWithSimulator):
             }
         )
 
+    def test_metrics_metadata_round_trip(self):
+        DependencyContext.get().add_dependency(HwMetricsEnabledKey(), True)
+        m = MetricManagerTestCircuit()
+        metrics_manager = HardwareMetricsManager()
+
+        with self.run_simulation(m):
+            pass
+
+        metric = metrics_manager.get_metrics()["foo.counter1"]
+        expected = MetricModel(
+            "foo.counter1",
+            "this is the description",
+            {"count": MetricRegisterModel("count", "the value of the counter", 32)},
+        )
+
+        assert MetricModel.from_dict(metric.to_dict()) == expected
+        assert MetricModel.from_json(metric.to_json()) == expected
+        assert MetricRegisterModel.from_dict(expected.regs["count"].to_dict()) == expected.regs["count"]
+
     def test_returned_reg_values(self):
         random.seed(42)
 
@@ -7,7 +7,7 @@ from transactron import *
 from transactron.lib.adapters import Adapter
 from transactron.lib.reqres import *
 from transactron.testing.method_mock import MethodMock
-from transactron.utils import ModuleConnector
+from transactron.utils import ModuleConnector, DependencyContext
 from transactron.testing import (
     SimpleTestCircuit,
     TestCaseWithSimulator,
@@ -91,3 +91,7 @@ class TestSerializer(TestCaseWithSimulator):
             for i in range(port_count):
                 sim.add_testbench(self.requestor(i))
                 sim.add_testbench(self.responder(i))
+
+    def test_serial_depth_override(self, port_count: int):
+        DependencyContext.get().add_dependency(FifoDepthOverrideKey(), 1)
+        self.test_serial(port_count)
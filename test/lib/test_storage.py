@@ -8,6 +8,7 @@ from datetime import timedelta
 from hypothesis import given, settings, Phase
 import amaranth.lib.memory as memory
 import amaranth_types.memory as amemory
+from transactron import Method, TModule, Transaction, def_method
 from transactron.testing import *
 from transactron.testing.input_generation import OpNOP, generate_process_input
 from transactron.lib.storage import *
@@ -143,6 +144,51 @@ class TestContentAddressableMemory(TestCaseWithSimulator):
             sim.add_testbench(self.remove_process(in_remove))
 
 
+class TestTernaryContentAddressableMemory(TestCaseWithSimulator):
+    addr_width = 6
+    content_width = 5
+    entries_count = 4
+
+    def test_random(self):
+        random.seed(42)
+        circ = SimpleTestCircuit(
+            ContentAddressableMemory(
+                data_layout(self.addr_width), data_layout(self.content_width), self.entries_count, ternary=True
+            )
+        )
+
+        entries = []
+        # disjoint address ranges, selected by the top two address bits
+        for i in range(self.entries_count):
+            ignore_bits = random.randrange(self.addr_width - 1)
+            mask = (1 << ignore_bits) - 1
+            addr = (i << (self.addr_width - 2)) | random.randrange(2 ** (self.addr_width - 2)) & ~mask
+            entries.append((addr, mask, random.randrange(2**self.content_width)))
+
+        def lookup(addr: int):
+            for stored, mask, data in entries:
+                if addr & ~mask == stored & ~mask:
+                    return data
+            return None
+
+        async def process(sim: TestbenchContext):
+            for addr, mask, data in entries:
+                await circ.push.call(sim, addr={"data": addr}, data={"data": data}, mask={"data": mask})
+
+            for _ in range(100):
+                addr = random.randrange(2**self.addr_width)
+                expected = lookup(addr)
+                response = await circ.read.call(sim, addr={"data": addr})
+                if expected is None:
+                    assert response.not_found
+                else:
+                    assert not response.not_found
+                    assert response.data.data == expected
+
+        with self.run_simulation(circ) as sim:
+            sim.add_testbench(process)
+
+
 bank_shapes = [
     (6, lambda x: x, lambda x: x),
     (make_layout(("data_field", 6)), lambda x: {"data_field": x}, lambda x: x["data_field"]),
@@ -177,6 +223,7 @@ class TestMemoryBank(TestCaseWithSimulator):
         shape: ShapeLike,
         to_shape: Callable,
         from_shape: Callable,
+        buffered: bool = True,
     ):
         test_count = 200
 
@@ -186,6 +233,7 @@ class TestMemoryBank(TestCaseWithSimulator):
                 depth=max_addr,
                 transparent=transparent,
                 read_on_resp=read_on_resp,
+                buffered=buffered,
                 read_ports=read_ports,
                 write_ports=write_ports,
                 memory_type=memory_type,
@@ -265,6 +313,97 @@ class TestMemoryBank(TestCaseWithSimulator):
             for i in range(write_ports):
                 sim.add_testbench(writer(i))
 
+    @pytest.mark.parametrize("max_addr, writer_rand, reader_req_rand, reader_resp_rand, seed", test_conf)
+    @pytest.mark.parametrize("transparent", [False, True])
+    @pytest.mark.parametrize("read_on_resp", [False, True])
+    def test_mem_unbuffered(
+        self,
+        max_addr: int,
+        writer_rand: int,
+        reader_req_rand: int,
+        reader_resp_rand: int,
+        seed: int,
+        transparent: bool,
+        read_on_resp: bool,
+    ):
+        shape, to_shape, from_shape = bank_shapes[0]
+        self.test_mem(
+            max_addr,
+            writer_rand,
+            reader_req_rand,
+            reader_resp_rand,
+            seed,
+            transparent,
+            read_on_resp,
+            read_ports=2,
+            write_ports=2,
+            memory_type=memory.Memory,
+            shape=shape,
+            to_shape=to_shape,
+            from_shape=from_shape,
+            buffered=False,
+        )
+
+
+class MemoryBankReadLoop(Elaboratable):
+    """Reads consecutive addresses, taking each response and issuing the next request in one transaction."""
+
+    def __init__(self, buffered: bool):
+        self.bank = MemoryBank(shape=8, depth=16, buffered=buffered)
+        self.write = self.bank.write[0]
+        self.start = Method()
+        self.transfers = Signal(8)
+        self.errors = Signal(8)
+
+    def elaborate(self, platform):
+        m = TModule()
+
+        m.submodules.bank = self.bank
+
+        started = Signal()
+        addr = Signal(4)
+
+        @def_method(m, self.start, ready=~started)
+        def _():
+            self.bank.read_req[0](m, addr=0)
+            m.d.sync += started.eq(1)
+
+        with Transaction().body(m, ready=started):
+            resp = self.bank.read_resp[0](m)
+            self.bank.read_req[0](m, addr=addr + 1)
+            m.d.sync += addr.eq(addr + 1)
+            m.d.sync += self.transfers.eq(self.transfers + 1)
+            with m.If(resp.data != addr * 2 + 1):
+                m.d.sync += self.errors.eq(self.errors + 1)
+
+        return m
+
+
+class TestMemoryBankReadLoop(TestCaseWithSimulator):
+    def test_read_loop_unbuffered(self):
+        import networkx
+
+        m = SimpleTestCircuit(MemoryBankReadLoop(buffered=False))
+
+        with pytest.raises(networkx.NetworkXUnfeasible):
+            with self.run_simulation(m):
+                pass
+
+    def test_read_loop(self):
+        m = SimpleTestCircuit(MemoryBankReadLoop(buffered=True))
+        cycles = 20
+
+        async def process(sim: TestbenchContext):
+            for a in range(16):
+                await m.write.call(sim, addr=a, data=2 * a + 1)
+            await m.start.call(sim)
+            await sim.tick().repeat(cycles)
+            assert sim.get(m._dut.transfers) >= cycles - 1
+            assert sim.get(m._dut.errors) == 0
+
+        with self.run_simulation(m) as sim:
+            sim.add_testbench(process)
+
 
 class TestAsyncMemoryBank(TestCaseWithSimulator):
     @pytest.mark.parametrize(
@@ -29,11 +29,14 @@ class TBInterface(ComponentInterface):
 
 class TestComponentInterface(TestCase):
     def test_a(self):
+        ci = TBInterface()
+        sig = ci.signature
+
         class TestComponent(Component):
             iface: TBInterface
 
             def __init__(self):
-                super().__init__({"iface": In(TBInterface().signature)})
+                super().__init__({"iface": In(sig)})
 
         t = TestComponent()
         t._MustUse__silence = True  # type: ignore
@@ -41,9 +44,7 @@ class TestComponentInterface(TestCase):
         assert isinstance(t.iface.i, Signal)
         assert isinstance(t.iface.s.i, Signal)
         assert isinstance(t.iface.f.i, Signal)
-
-        ci = TBInterface()
-        sig = ci.signature
+        assert ci.signature is sig
 
         assert sig.members["s"].signature.members["i"].flow is Flow.In
         assert sig.members["f"].signature.members["i"].flow is Flow.Out
@@ -14,48 +14,45 @@ from transactron.testing import TestCaseWithSimulator, TestbenchContext
 class ShifterCircuit(Elaboratable):
     def __init__(
         self,
-        shift_fun: Callable[[ValueLike, ValueLike], Value],
+        shift_funs: Sequence[tuple[Callable[[ValueLike, ValueLike], Value], Iterable[tuple[str, Any]]]],
         width: int,
-        shift_kwargs: Iterable[tuple[str, Any]] = (),
     ):
         self.input = Signal(width)
-        self.output = Signal(width)
+        self.outputs = [Signal(width) for _ in shift_funs]
         self.offset = Signal(range(width + 1))
-        self.shift_fun = shift_fun
-        self.kwargs = dict(shift_kwargs)
+        self.shift_funs = [(shift_fun, dict(shift_kwargs)) for shift_fun, shift_kwargs in shift_funs]
 
     def elaborate(self, platform):
         m = Module()
 
-        m.d.comb += self.output.eq(self.shift_fun(self.input, self.offset, **self.kwargs))
+        for output, (shift_fun, kwargs) in zip(self.outputs, self.shift_funs):
+            m.d.comb += output.eq(shift_fun(self.input, self.offset, **kwargs))
 
         return m
 
 
 class TestShifter(TestCaseWithSimulator):
-    @pytest.mark.parametrize(
-        "shift_fun, shift_kwargs, test_fun",
-        [
-            (shift_left, [], lambda val, offset, width: (val << offset) % 2**width),
-            (shift_right, [], lambda val, offset, width: (val >> offset)),
-            (
-                shift_left,
-                [("placeholder", 1)],
-                lambda val, offset, width: ((val << offset) | (2**width - 1 >> (width - offset))) % 2**width,
-            ),
-            (
-                shift_right,
-                [("placeholder", 1)],
-                lambda val, offset, width: ((val >> offset) | (2**width - 1 << (width - offset))) % 2**width,
-            ),
-            (rotate_left, [], lambda val, offset, width: ((val << offset) | (val >> (width - offset))) % 2**width),
-            (rotate_right, [], lambda val, offset, width: ((val >> offset) | (val << (width - offset))) % 2**width),
-        ],
-    )
-    def test_shifter(self, shift_fun, shift_kwargs, test_fun):
+    shifter_tests = [
+        (shift_left, [], lambda val, offset, width: (val << offset) % 2**width),
+        (shift_right, [], lambda val, offset, width: (val >> offset)),
+        (
+            shift_left,
+            [("placeholder", 1)],
+            lambda val, offset, width: ((val << offset) | (2**width - 1 >> (width - offset))) % 2**width,
+        ),
+        (
+            shift_right,
+            [("placeholder", 1)],
+            lambda val, offset, width: ((val >> offset) | (2**width - 1 << (width - offset))) % 2**width,
+        ),
+        (rotate_left, [], lambda val, offset, width: ((val << offset) | (val >> (width - offset))) % 2**width),
+        (rotate_right, [], lambda val, offset, width: ((val >> offset) | (val << (width - offset))) % 2**width),
+    ]
+
+    def test_shifter(self):
         width = 8
         tests = 50
-        dut = ShifterCircuit(shift_fun, width, shift_kwargs)
+        dut = ShifterCircuit([(shift_fun, shift_kwargs) for shift_fun, shift_kwargs, _ in self.shifter_tests], width)
 
         async def test_process(sim: TestbenchContext):
             for _ in range(tests):
@@ -63,8 +60,9 @@ class TestShifter(TestCaseWithSimulator):
                 offset = random.randrange(width + 1)
                 sim.set(dut.input, val)
                 sim.set(dut.offset, offset)
-                _, result = await sim.delay(1e-9).sample(dut.output)
-                assert result == test_fun(val, offset, width)
+                _, *results = await sim.delay(1e-9).sample(*dut.outputs)
+                for (shift_fun, shift_kwargs, test_fun), result in zip(self.shifter_tests, results):
+                    assert result == test_fun(val, offset, width), f"{shift_fun.__name__} {shift_kwargs}"
 
         with self.run_simulation(dut, add_transaction_module=False) as sim:
             sim.add_testbench(test_process)
@@ -73,26 +71,46 @@ class TestShifter(TestCaseWithSimulator):
 class VecShifterCircuit(Elaboratable):
     def __init__(
         self,
-        shift_fun: Callable[[Sequence, ValueLike], Sequence],
+        shift_funs: Sequence[tuple[Callable[[Sequence, ValueLike], Sequence], Iterable[tuple[str, Any]]]],
         shape: ShapeLike,
         width: int,
-        shift_kwargs: Iterable[tuple[str, Any]] = (),
     ):
         self.input = Signal(data.ArrayLayout(shape, width))
-        self.output = Signal(data.ArrayLayout(shape, width))
+        self.outputs = [Signal(data.ArrayLayout(shape, width)) for _ in shift_funs]
         self.offset = Signal(range(width + 1))
-        self.shift_fun = shift_fun
-        self.kwargs = dict(shift_kwargs)
+        self.shift_funs = [(shift_fun, dict(shift_kwargs)) for shift_fun, shift_kwargs in shift_funs]
 
     def elaborate(self, platform):
         m = Module()
 
-        m.d.comb += assign(self.output, self.shift_fun(cast(Sequence, self.input), self.offset, **self.kwargs))
+        for output, (shift_fun, kwargs) in zip(self.outputs, self.shift_funs):
+            m.d.comb += assign(output, shift_fun(cast(Sequence, self.input), self.offset, **kwargs))
 
         return m
 
 
 class TestVecShifter(TestCaseWithSimulator):
+    vec_shifter_tests = [
+        (shift_vec_left, lambda mkc: [], lambda val, offset, mkc: [mkc(0)] * offset + val[: len(val) - offset]),
+        (shift_vec_right, lambda mkc: [], lambda val, offset, mkc: val[offset:] + [mkc(0)] * offset),
+        (
+            shift_vec_left,
+            lambda mkc: [("placeholder", mkc(1))],
+            lambda val, offset, mkc: [mkc(1)] * offset + val[: len(val) - offset],
+        ),
+        (
+            shift_vec_right,
+            lambda mkc: [("placeholder", mkc(1))],
+            lambda val, offset, mkc: val[offset:] + [mkc(1)] * offset,
+        ),
+        (
+            rotate_vec_left,
+            lambda mkc: [],
+            lambda val, offset, mkc: val[len(val) - offset :] + val[: len(val) - offset],
+        ),
+        (rotate_vec_right, lambda mkc: [], lambda val, offset, mkc: val[offset:] + val[:offset]),
+    ]
+
     @pytest.mark.parametrize(
         "shape",
         [
@@ -100,36 +118,17 @@ class TestVecShifter(TestCaseWithSimulator):
             data.ArrayLayout(2, 2),
         ],
     )
-    @pytest.mark.parametrize(
-        "shift_fun, shift_kwargs, test_fun",
-        [
-            (shift_vec_left, lambda mkc: [], lambda val, offset, mkc: [mkc(0)] * offset + val[: len(val) - offset]),
-            (shift_vec_right, lambda mkc: [], lambda val, offset, mkc: val[offset:] + [mkc(0)] * offset),
-            (
-                shift_vec_left,
-                lambda mkc: [("placeholder", mkc(1))],
-                lambda val, offset, mkc: [mkc(1)] * offset + val[: len(val) - offset],
-            ),
-            (
-                shift_vec_right,
-                lambda mkc: [("placeholder", mkc(1))],
-                lambda val, offset, mkc: val[offset:] + [mkc(1)] * offset,
-            ),
-            (
-                rotate_vec_left,
-                lambda mkc: [],
-                lambda val, offset, mkc: val[len(val) - offset :] + val[: len(val) - offset],
-            ),
-            (rotate_vec_right, lambda mkc: [], lambda val, offset, mkc: val[offset:] + val[:offset]),
-        ],
-    )
-    def test_vec_shifter(self, shape, shift_fun, shift_kwargs, test_fun):
+    def test_vec_shifter(self, shape):
         def mk_const(x):
             return const_of(x, shape)
 
         width = 8
         tests = 50
-        dut = VecShifterCircuit(shift_fun, shape, width, shift_kwargs(mk_const))
+        dut = VecShifterCircuit(
+            [(shift_fun, shift_kwargs(mk_const)) for shift_fun, shift_kwargs, _ in self.vec_shifter_tests],
+            shape,
+            width,
+        )
 
         async def test_process(sim: TestbenchContext):
             for _ in range(tests):
@@ -137,8 +136,9 @@ class TestVecShifter(TestCaseWithSimulator):
                 offset = random.randrange(width + 1)
                 sim.set(dut.input, val)
                 sim.set(dut.offset, offset)
-                _, result = await sim.delay(1e-9).sample(dut.output)
-                assert result == test_fun(val, offset, mk_const)
+                _, *results = await sim.delay(1e-9).sample(*dut.outputs)
+                for (shift_fun, _, test_fun), result in zip(self.vec_shifter_tests, results):
+                    assert result == test_fun(val, offset, mk_const), shift_fun.__name__
 
         with self.run_simulation(dut, add_transaction_module=False) as sim:
             sim.add_testbench(test_process)
@@ -8,10 +8,13 @@ from transactron.utils import (
     align_to_power_of_two,
     align_down_to_power_of_two,
     popcount,
+    csa_sum_value,
     count_leading_zeros,
     count_trailing_zeros,
     cyclic_mask,
+    from_method_layout,
 )
+from amaranth.hdl import ShapeCastable
 from amaranth.utils import ceil_log2
 
 
@@ -55,6 +58,42 @@ class TestAlignToPowerOfTwo(unittest.TestCase):
             assert expected == out
 
 
+class UnhashableShape(ShapeCastable):
+    def __init__(self, width: int):
+        self.width = width
+
+    def __eq__(self, other):
+        return isinstance(other, UnhashableShape) and self.width == other.width
+
+    def as_shape(self):
+        return unsigned(self.width)
+
+    def const(self, init):
+        return C(init or 0, self.width)
+
+    def from_bits(self, raw):
+        return raw
+
+    def __call__(self, target):
+        return target
+
+
+class TestFromMethodLayout(unittest.TestCase):
+    def test_cached(self):
+        assert from_method_layout([("a", 1), ("b", [("c", 2)])]) is from_method_layout(
+            iter([("a", 1), ("b", [("c", 2)])])
+        )
+
+    def test_unhashable_iterable(self):
+        layout = from_method_layout((k, v) for k, v in [("a", UnhashableShape(4)), ("b", 3)])
+        assert list(layout.members) == ["a", "b"]
+        assert layout.size == 7
+
+    def test_tuple_field_rejected(self):
+        with pytest.raises(TypeError):
+            from_method_layout([("a", (("b", 1),))])
+
+
 class PopcountTestCircuit(Elaboratable):
     def __init__(self, size: int):
         self.sig_in = Signal(size)
@@ -94,6 +133,38 @@ class TestPopcount(TestCaseWithSimulator):
             sim.add_testbench(self.process)
 
 
+class CSASumTestCircuit(Elaboratable):
+    def __init__(self, count: int, width: int):
+        self.sigs_in = [Signal(width) for _ in range(count)]
+        self.sig_out = Signal(width + ceil_log2(count))
+
+    def elaborate(self, platform):
+        m = Module()
+
+        m.d.comb += self.sig_out.eq(csa_sum_value(self.sigs_in))
+
+        return m
+
+
+@pytest.mark.parametrize("count, width", [(1, 4), (2, 4), (3, 1), (4, 8), (7, 5), (10, 3)])
+class TestCSASum(TestCaseWithSimulator):
+    def test_csa_sum(self, count: int, width: int):
+        random.seed(14)
+        m = CSASumTestCircuit(count, width)
+
+        async def process(sim: TestbenchContext):
+            for values in [[2**width - 1] * count] + [
+                [random.randrange(2**width) for _ in range(count)] for _ in range(40)
+            ]:
+                for sig, value in zip(m.sigs_in, values):
+                    sim.set(sig, value)
+                assert sim.get(m.sig_out) == sum(values)
+                await sim.delay(1e-6)
+
+        with self.run_simulation(m) as sim:
+            sim.add_testbench(process)
+
+
 class CLZTestCircuit(Elaboratable):
     def __init__(self, xlen: int):
         self.sig_in = Signal(xlen)
@@ -2,7 +2,6 @@ from collections import defaultdict
 from collections.abc import Iterator, Sequence
 from contextlib import contextmanager
 from itertools import count
-from functools import cached_property
 
 from amaranth.lib.data import StructLayout
 from transactron.core.tmodule import CtrlPath, TModule
@@ -13,7 +12,7 @@ from amaranth_types import ShapeLike, ValueLike, SrcLoc
 from typing import TYPE_CHECKING, ClassVar, NewType, NotRequired, Optional, Callable, TypedDict, Unpack, final
 from transactron.utils.amaranth_ext.functions import one_hot_mux
 from transactron.utils.assign import AssignArg
-from transactron.utils.transactron_helpers import from_method_layout, method_def_helper
+from transactron.utils.transactron_helpers import def_helper_takes_arg, from_method_layout
 from transactron.utils.typing import MethodStruct
 
 if TYPE_CHECKING:
@@ -35,10 +34,30 @@ class BodyParams(AdapterBodyParams):
 
 @final
 class Body(TransactionBase["Body"]):
+    __slots__ = (
+        "def_order",
+        "name",
+        "owner",
+        "ready",
+        "runnable",
+        "run",
+        "data_in",
+        "data_out",
+        "_combiner",
+        "nonexclusive",
+        "single_caller",
+        "validate_arguments",
+        "method_calls",
+        "ctrl_path",
+        "defined",
+        "_conditional_calls",
+        "_validate_arguments_takes_arg",
+    )
+
     def_counter: ClassVar[count] = count()
     def_order: int
     stack: ClassVar[list["Body"]] = []
-    ctrl_path: CtrlPath = CtrlPath(-1, ())
+    ctrl_path: CtrlPath
     method_calls: defaultdict["Method", list[tuple[CtrlPath, MethodStruct, Value]]]
 
     def __init__(
@@ -53,16 +72,17 @@ class Body(TransactionBase["Body"]):
     ):
         super().__init__(src_loc=src_loc)
 
-        self.def_order = next(Body.def_counter)
+        self.def_order = _next_def_order()
         self.name = name
         self.owner = owner
-        self.ready = Signal(name=self.owned_name + "_ready")
-        self.runnable = Signal(name=self.owned_name + "_runnable")
-        self.run = Signal(name=self.owned_name + "_run")
-        self.data_in: MethodStruct = Signal(from_method_layout(i), name=self.owned_name + "_data_in")
-        self.data_out: MethodStruct = Signal(from_method_layout(o), name=self.owned_name + "_data_out")
-        self.combiner: Callable[[Module, Sequence[MethodStruct], Value], AssignArg] = (
-            kwargs["combiner"] if "combiner" in kwargs else Body._default_combiner(from_method_layout(i))
+        owned_name = self.owned_name
+        self.ready = Signal(name=owned_name + "_ready")
+        self.runnable = Signal(name=owned_name + "_runnable")
+        self.run = Signal(name=owned_name + "_run")
+        self.data_in: MethodStruct = Signal(from_method_layout(i), name=owned_name + "_data_in")
+        self.data_out: MethodStruct = Signal(from_method_layout(o), name=owned_name + "_data_out")
+        self._combiner: Optional[Callable[[Module, Sequence[MethodStruct], Value], AssignArg]] = (
+            kwargs["combiner"] if "combiner" in kwargs else None
         )
         self.nonexclusive = kwargs["nonexclusive"] if "nonexclusive" in kwargs else False
         self.single_caller = kwargs["single_caller"] if "single_caller" in kwargs else False
@@ -70,22 +90,42 @@ class Body(TransactionBase["Body"]):
             kwargs["validate_arguments"] if "validate_arguments" in kwargs else None
         )
         self.method_calls = defaultdict(list)
+        self.ctrl_path = CtrlPath(-1, ())
+        self.defined = False
+        self._conditional_calls: Optional[set["Method"]] = None
+        self._validate_arguments_takes_arg: Optional[bool] = None
 
         if self.nonexclusive:
             assert len(self.data_in.as_value()) == 0 or "combiner" in kwargs
 
-    @cached_property
+    @property
+    def combiner(self) -> Callable[[Module, Sequence[MethodStruct], Value], AssignArg]:
+        if self._combiner is None:
+            self._combiner = Body._default_combiner(self.data_in.shape())
+        return self._combiner
+
+    @property
     def conditional_calls(self) -> set["Method"]:
-        return {
-            method
-            for method, calls in self.method_calls.items()
-            if any(len(ctrl_path.path) > len(self.ctrl_path.path) + 1 for ctrl_path, _, _ in calls)
-        }
+        if self._conditional_calls is None:
+            self._conditional_calls = {
+                method
+                for method, calls in self.method_calls.items()
+                if any(len(ctrl_path.path) > len(self.ctrl_path.path) + 1 for ctrl_path, _, _ in calls)
+            }
+        return self._conditional_calls
 
     def _validate_arguments(self, en: Value, arg_rec: MethodStruct) -> ValueLike:
-        if self.validate_arguments is not None:
-            return self.ready & (~en | method_def_helper(self, self.validate_arguments, arg_rec))
-        return self.ready
+        if self.validate_arguments is None:
+            return self.ready
+        if self._validate_arguments_takes_arg is None:
+            self._validate_arguments_takes_arg = def_helper_takes_arg(
+                f"method definition for {self}", self.validate_arguments, MethodStruct, arg_rec.shape().members.keys()
+            )
+        if self._validate_arguments_takes_arg:
+            valid = self.validate_arguments(arg_rec)
+        else:
+            valid = self.validate_arguments(**{k: arg_rec[k] for k in arg_rec.shape().members})
+        return self.ready & (~en | valid)
 
     @contextmanager
     def context(self, m: TModule) -> Iterator["Body"]:
@@ -119,6 +159,8 @@ class Body(TransactionBase["Body"]):
     @staticmethod
     def _default_combiner(shape: ShapeLike):
         def impl(m: Module, args: Sequence[MethodStruct], runs: Value) -> AssignArg:
+            if len(args) == 1:
+                return args[0]
             arg = Signal(shape)
             m.d.comb += arg.eq(one_hot_mux(runs, args, assert_one_hot=False))
             return arg
@@ -126,5 +168,8 @@ class Body(TransactionBase["Body"]):
         return impl
 
 
+_next_def_order = Body.def_counter.__next__
+
+
 TBody = NewType("TBody", Body)
 MBody = NewType("MBody", Body)
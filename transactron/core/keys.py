@@ -10,21 +10,21 @@ if TYPE_CHECKING:
 __all__ = ["TransactionManagerKey", "TransactionsKey", "DefinedMethodsKey", "ProvidedMethodsKey"]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TransactionManagerKey(SimpleKey["TransactionManager"]):
     pass
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TransactionsKey(ListKey["Transaction"]):
     pass
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class DefinedMethodsKey(ListKey["Method"]):
     pass
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ProvidedMethodsKey(ListKey["Method"]):
     pass
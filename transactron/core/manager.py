@@ -249,10 +249,13 @@ class TransactionManager(Elaboratable):
         cgr: TransactionGraph = {}  # Conflict graph
         pgr: TransactionGraph = {}  # Priority graph
 
+        def add_conflict_edge(begin: TBody, end: TBody):
+            cgr[begin].add(end)
+            cgr[end].add(begin)
+
         def add_edge(begin: TBody, end: TBody, priority: Priority, conflict: bool):
             if conflict:
-                cgr[begin].add(end)
-                cgr[end].add(begin)
+                add_conflict_edge(begin, end)
             match priority:
                 case Priority.LEFT:
                     pgr[end].add(begin)
@@ -267,7 +270,7 @@ class TransactionManager(Elaboratable):
             for transaction1 in method_map.transactions_for(method):
                 for transaction2 in method_map.transactions_for(method):
                     if transaction1 is not transaction2 and not calls_nonexclusive(transaction1, transaction2, method):
-                        add_edge(transaction1, transaction2, Priority.UNDEFINED, True)
+                        add_conflict_edge(transaction1, transaction2)
 
         relations = TransactionManager._relations(method_map)
 
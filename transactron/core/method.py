@@ -96,10 +96,11 @@ class Method(TransactionBase["Transaction | Method"]):
         super().__init__(src_loc=get_src_loc(src_loc))
         self.owner, owner_name = get_caller_class_name(default="$method")
         self.name = name or tracer.get_var_name(depth=2, default=owner_name)
-        self.ready = Signal(name=self.owned_name + "_ready")
-        self.run = Signal(name=self.owned_name + "_run")
-        self.data_in: MethodStruct = Signal(from_method_layout(i), name=self.owned_name + "_data_in")
-        self.data_out: MethodStruct = Signal(from_method_layout(o), name=self.owned_name + "_data_out")
+        owned_name = self.owned_name
+        self.ready = Signal(name=owned_name + "_ready")
+        self.run = Signal(name=owned_name + "_run")
+        self.data_in: MethodStruct = Signal(from_method_layout(i), name=owned_name + "_data_in")
+        self.data_out: MethodStruct = Signal(from_method_layout(o), name=owned_name + "_data_out")
 
     @property
     def layout_in(self):
@@ -78,9 +78,10 @@ class Transaction(TransactionBase["Transaction | Method"]):
         self.owner, owner_name = get_caller_class_name(default="$transaction")
         self.name = name or tracer.get_var_name(depth=2, default=owner_name)
         DependencyContext.get().add_dependency(TransactionsKey(), self)
-        self.ready = Signal(name=self.owned_name + "_ready")
-        self.runnable = Signal(name=self.owned_name + "_runnable")
-        self.run = Signal(name=self.owned_name + "_run")
+        owned_name = self.owned_name
+        self.ready = Signal(name=owned_name + "_ready")
+        self.runnable = Signal(name=owned_name + "_runnable")
+        self.run = Signal(name=owned_name + "_run")
 
     @property
     def _body(self) -> TBody:
@@ -21,7 +21,7 @@ class Priority(Enum):
     RIGHT = auto()
 
 
-@dataclass
+@dataclass(slots=True)
 class RelationBase[T: TransactionBase]:
     _: KW_ONLY
     end: T
@@ -31,7 +31,7 @@ class RelationBase[T: TransactionBase]:
     silence_warning: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class Relation[T: TransactionBase](RelationBase[T]):
     _: KW_ONLY
     start: T
@@ -39,6 +39,8 @@ class Relation[T: TransactionBase](RelationBase[T]):
 
 @runtime_checkable
 class TransactionBase[T: TransactionBase](Owned, Protocol):
+    __slots__ = ("src_loc", "relations", "simultaneous_list", "independent_list")
+
     src_loc: SrcLoc
     relations: list[RelationBase[T]]
     simultaneous_list: list[T]
@@ -66,7 +68,7 @@ class TransactionBase[T: TransactionBase](Owned, Protocol):
             Defaults to undefined priority relation.
         """
         self.relations.append(
-            RelationBase(end=end, priority=priority, conflict=True, silence_warning=self.owner != end.owner)
+            RelationBase(end=end, priority=priority, conflict=True, silence_warning=self.owner is not end.owner)
         )
 
     def schedule_before(self, end: T, *, ready_dependent: bool = False) -> None:
@@ -90,7 +92,7 @@ class TransactionBase[T: TransactionBase](Owned, Protocol):
                 priority=Priority.LEFT,
                 conflict=False,
                 ready_dependent=ready_dependent,
-                silence_warning=self.owner != end.owner,
+                silence_warning=self.owner is not end.owner,
             )
         )
 
@@ -105,7 +107,7 @@ class TransactionBase[T: TransactionBase](Owned, Protocol):
         *others: Transaction or Method
             The `Transaction`\\s or `Method`\\s to be executed simultaneously.
         """
-        self.simultaneous_list += others
+        self.simultaneous_list.extend(others)
         for other in others:
             other.simultaneous_list.append(self)  # type: ignore
 
@@ -143,4 +145,4 @@ class TransactionBase[T: TransactionBase](Owned, Protocol):
             `Transaction` or `Method`, need to be independently considered
             for execution.
         """
-        self.independent_list += others
+        self.independent_list.extend(others)
@@ -43,12 +43,12 @@ class EmittedEvent:
     statics: dict[str, Any]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class EvLogKey(ListKey[EmittedEvent]):
     """DependencyManager key collecting all event emission sites."""
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class EvLogEnabledKey(SimpleKey[bool]):
     """DependencyManager key for enabling the event log. If the event log
     is disabled (the default), `EventSource.emit` is a no-op and no signals
@@ -11,6 +11,8 @@ from .tracing import TracingFragment
 
 
 class Owned(Protocol):
+    __slots__ = ()
+
     name: str
     owner: Optional[Elaboratable]
 
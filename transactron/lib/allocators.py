@@ -290,21 +290,32 @@ class CircularAllocator(Elaboratable):
     def elaborate(self, platform):
         m = TModule()
 
-        alloc_count = Signal(range(self.max_alloc + 1))
-        free_count = Signal(range(self.max_free + 1))
-
-        m.d.sync += self.allocated.eq(self.allocated + alloc_count - free_count)
+        # The wrap bits flip each time the corresponding pointer wraps around,
+        # so equal pointers mean empty if the bits are equal, and full otherwise.
+        start_wrap = Signal()
+        end_wrap = Signal()
+        wrapped = Signal()
+        m.d.comb += wrapped.eq(start_wrap != end_wrap)
+
+        empty = Signal()
+        full = Signal()
+        m.d.comb += empty.eq((self.start_idx == self.end_idx) & ~wrapped)
+        m.d.comb += full.eq((self.start_idx == self.end_idx) & wrapped)
+        m.d.comb += self.allocated.eq(
+            Mux(wrapped, self.end_idx + self.entries - self.start_idx, self.end_idx - self.start_idx)
+        )
 
         kwargs = {}
         if self.with_validate_arguments and self.max_alloc > 1:
             kwargs["validate_arguments"] = lambda count: self.allocated + count <= self.entries
 
-        @def_method(m, self.alloc, ready=self.allocated != self.entries, **kwargs)
+        @def_method(m, self.alloc, ready=~full, **kwargs)
         def _(count):
             new_end_idx = Signal.like(self.end_idx)
             m.d.av_comb += new_end_idx.eq(mod_add(self.end_idx, self.entries, count, self.max_alloc))
             m.d.sync += self.end_idx.eq(new_end_idx)
-            m.d.comb += alloc_count.eq(count)
+            with m.If(self.end_idx + count >= self.entries):
+                m.d.sync += end_wrap.eq(~end_wrap)
             return {
                 "idents": [mod_add(self.end_idx, self.entries, i, i) for i in range(self.max_alloc)],
                 "new_end_idx": new_end_idx,
@@ -314,12 +325,13 @@ class CircularAllocator(Elaboratable):
         if self.with_validate_arguments and self.max_free > 1:
             kwargs["validate_arguments"] = lambda count: count <= self.allocated
 
-        @def_method(m, self.free, ready=self.allocated != 0, **kwargs)
+        @def_method(m, self.free, ready=~empty, **kwargs)
         def _(count):
             new_start_idx = Signal.like(self.start_idx)
             m.d.av_comb += new_start_idx.eq(mod_add(self.start_idx, self.entries, count, self.max_free))
             m.d.sync += self.start_idx.eq(new_start_idx)
-            m.d.comb += free_count.eq(count)
+            with m.If(self.start_idx + count >= self.entries):
+                m.d.sync += start_wrap.eq(~start_wrap)
             return {
                 "idents": [mod_add(self.start_idx, self.entries, i, i) for i in range(self.max_free)],
                 "new_start_idx": new_start_idx,
@@ -329,6 +341,7 @@ class CircularAllocator(Elaboratable):
         def _():
             m.d.sync += self.start_idx.eq(0)
             m.d.sync += self.end_idx.eq(0)
-            m.d.sync += self.allocated.eq(0)
+            m.d.sync += start_wrap.eq(0)
+            m.d.sync += end_wrap.eq(0)
 
         return m
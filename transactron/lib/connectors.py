@@ -16,6 +16,7 @@ __all__ = [
     "ConnectTrans",
     "CrossbarConnectTrans",
     "Pipe",
+    "SpillRegister",
     "Connector",
     "ClearableConnector",
 ]
@@ -228,6 +229,83 @@ class Pipe(Elaboratable):
         return m
 
 
+class SpillRegister(Elaboratable):
+    """
+    Two-entry FIFO built from registers. Unlike `Pipe`, there are no
+    combinational paths between the `read` and the `write` methods, so it
+    can be used in place of a `BasicFifo` of depth 2, without the pointer
+    and occupancy logic.
+
+    Attributes
+    ----------
+    read: Method
+        Reads from the register. Accepts an empty argument, returns a structure.
+        Ready only if the register is not empty.
+    peek: Method, nonexclusive
+        Like `read`, but doesn't take the value from the register.
+    write: Method
+        Writes to the register. Accepts a structure, returns empty result.
+        Ready only if the register is not full.
+    clear: Method
+        Cleans the register. Has priority over `read` and `write` methods.
+    """
+
+    def __init__(self, layout: MethodLayout, *, src_loc: int | SrcLoc = 0):
+        """
+        Parameters
+        ----------
+        layout: method layout
+            The format of structures stored.
+        src_loc: int | SrcLoc
+            How many stack frames deep the source location is taken from.
+            Alternatively, the source location to use instead of the default.
+        """
+        src_loc = get_src_loc(src_loc)
+        self.read = Method(o=layout, src_loc=src_loc)
+        self.peek = Method(o=layout, src_loc=src_loc)
+        self.write = Method(i=layout, src_loc=src_loc)
+        self.clear = Method(src_loc=src_loc)
+        self.head = Signal.like(self.read.data_out)
+
+    def elaborate(self, platform):
+        m = TModule()
+
+        head_valid = Signal()
+        spill = Signal.like(self.read.data_out)
+        spill_valid = Signal()
+
+        with m.If(self.read.run):
+            m.d.sync += self.head.eq(spill)
+            m.d.sync += head_valid.eq(spill_valid)
+            m.d.sync += spill_valid.eq(0)
+
+        @def_method(m, self.read, ready=head_valid)
+        def _():
+            return self.head
+
+        @def_method(m, self.peek, ready=head_valid, nonexclusive=True)
+        def _():
+            return self.head
+
+        # The spill entry is empty whenever `write` runs, so a simultaneous
+        # `read` leaves the head free for the written value.
+        @def_method(m, self.write, ready=~spill_valid)
+        def _(arg):
+            with m.If(~head_valid | self.read.run):
+                m.d.sync += self.head.eq(arg)
+                m.d.sync += head_valid.eq(1)
+            with m.Else():
+                m.d.sync += spill.eq(arg)
+                m.d.sync += spill_valid.eq(1)
+
+        @def_method(m, self.clear, nonexclusive=True)
+        def _():
+            m.d.sync += head_valid.eq(0)
+            m.d.sync += spill_valid.eq(0)
+
+        return m
+
+
 class Connect(Elaboratable):
     """Forwarding by transaction simultaneity
 
@@ -18,6 +18,8 @@ class UnifierKey(DependencyKey["Method", tuple["Method", Iterable["Unifier"]]]):
     `Unifier` module needs to be added as submodule when calling `combine`.
     """
 
+    __slots__ = ()
+
     unifier: Callable[[list["Method"]], "Unifier"]
 
     cache = False
@@ -2,13 +2,13 @@ from typing import Optional
 from amaranth import *
 import amaranth.lib.memory as memory
 import amaranth.lib.data as data
+from amaranth.utils import exact_log2
 from amaranth_types import ShapeLike, ValueLike, SrcLoc
 from transactron import Method, def_method, TModule
 from transactron.lib.allocators import CircularAllocator
 from transactron.utils.typing import MethodLayout, MethodStruct
 from transactron.utils.amaranth_ext import mod_incr, rotate_vec_right, rotate_vec_left
 from transactron.utils.amaranth_ext.functions import const_of
-from transactron.utils.amaranth_ext.shifter import rotate_left
 from transactron.utils.transactron_helpers import from_method_layout, get_src_loc
 
 
@@ -84,7 +84,7 @@ class BasicFifo(Elaboratable):
         layout: method layout
             Layout of data stored in the FIFO.
         depth: int
-            Size of the FIFO.
+            Size of the FIFO. Power of two sizes make index wraparound free.
         src_loc: int | SrcLoc
             How many stack frames deep the source location is taken from.
             Alternatively, the source location to use instead of the default.
@@ -197,6 +197,7 @@ class WideFifo(Elaboratable):
             Shape of the data stored in the queue.
         depth: int
             Depth of the FIFO. Must be a multiple of `max(read_width, write_width)`.
+            Index wraparound is free when `depth // max(read_width, write_width)` is a power of two.
         read_width: int
             Number of elements which can be simultaneously read from the queue.
         write_width: int, optional
@@ -294,27 +295,41 @@ class WideFifo(Elaboratable):
         read_data = [port.data for port in read_ports]
         head = rotate_vec_right(read_data, read_idx.col)[: self.read_width]
 
-        head_sig = [Signal.like(item) for item in head]
-        for item_sig, item in zip(head_sig, head):
-            m.d.comb += item_sig.eq(item)
+        col_bits = exact_log2(col_count) if col_count & (col_count - 1) == 0 else None
+        row_pow2 = row_count & (row_count - 1) == 0
 
         def incr_row_col(idx: data.View, incr_row: Value, count: Value):
             chg_idx = Signal(self.idx_layout)
-            with m.If(idx.col + count >= col_count):
-                m.d.comb += chg_idx.row.eq(incr_row)
-                m.d.comb += chg_idx.col.eq(idx.col + count - col_count)
-            with m.Else():
-                m.d.comb += chg_idx.row.eq(idx.row)
-                m.d.comb += chg_idx.col.eq(idx.col + count)
+            if col_bits is not None and row_pow2:
+                # Both fields are exactly as wide as their ranges, so the whole index wraps naturally.
+                m.d.comb += chg_idx.as_value().eq(idx.as_value() + count)
+            elif col_bits is not None:
+                col_sum = Signal(col_bits + 1)
+                m.d.comb += col_sum.eq(idx.col + count)
+                m.d.comb += chg_idx.col.eq(col_sum[:col_bits])
+                m.d.comb += chg_idx.row.eq(Mux(col_sum[col_bits], incr_row, idx.row))
+            else:
+                with m.If(idx.col + count >= col_count):
+                    m.d.comb += chg_idx.row.eq(incr_row)
+                    m.d.comb += chg_idx.col.eq(idx.col + count - col_count)
+                with m.Else():
+                    m.d.comb += chg_idx.row.eq(idx.row)
+                    m.d.comb += chg_idx.col.eq(idx.col + count)
             return chg_idx
 
+        write_pad = [const_of(0, self.shape)] * (col_count - self.write_width)
+
         @def_method(m, self.write, remaining != 0, validate_arguments=lambda count, data: count <= remaining)
         def _(count, data):
-            ext_data = list(data) + [const_of(0, self.shape)] * (col_count - self.write_width)
+            ext_data = [*data, *write_pad]
             shifted_data = rotate_vec_left(ext_data, write_idx.col)
-            ens = Signal(col_count)
-            m.d.comb += ens.eq(Cat(i < count for i in range(col_count)))
-            m.d.comb += Cat(port.en for port in write_ports).eq(rotate_left(ens, write_idx.col))
+            # Write enables for each start column and element count are known at elaboration time.
+            with m.Switch(Cat(count, write_idx.col)):
+                for col in range(col_count):
+                    for cnt in range(self.write_width + 1):
+                        with m.Case(cnt | (col << len(count))):
+                            mask = sum(1 << ((col + i) % col_count) for i in range(cnt))
+                            m.d.comb += Cat(port.en for port in write_ports).eq(mask)
             m.d.av_comb += [write_ports[i].data.eq(shifted_data[i]) for i in range(col_count)]
             m.d.comb += write_count.eq(count)
             m.d.sync += write_idx.eq(incr_row_col(write_idx, incr_write_row, count))
@@ -369,13 +384,17 @@ class Semaphore(Elaboratable):
     def elaborate(self, platform) -> TModule:
         m = TModule()
 
-        m.d.comb += self.release_ready.eq(self.count > 0)
-        m.d.comb += self.acquire_ready.eq(self.count < self.max_count)
+        m.d.comb += self.release_ready.eq(self.count.any())
+        if self.max_count & (self.max_count - 1) == 0:
+            # The counter is one bit wider than `log2(max_count)`, so its top bit is set only when full.
+            m.d.comb += self.acquire_ready.eq(~self.count[-1])
+        else:
+            m.d.comb += self.acquire_ready.eq(self.count < self.max_count)
 
-        with m.If(self.clear.run):
-            m.d.comb += self.count_next.eq(0)
-        with m.Else():
-            m.d.comb += self.count_next.eq(self.count + self.acquire.run - self.release.run)
+        # Clearing masks both terms, so it folds into the increment/decrement instead of a separate mux.
+        m.d.comb += self.count_next.eq(
+            Mux(self.clear.run, 0, self.count + self.acquire.run) - (self.release.run & ~self.clear.run)
+        )
 
         m.d.sync += self.count.eq(self.count_next)
 
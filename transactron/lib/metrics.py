@@ -1,17 +1,17 @@
+import json
 from dataclasses import dataclass, field
 from amaranth.lib.data import ArrayLayout, StructLayout
-from dataclasses_json import dataclass_json
-from typing import Optional, Type, TypeVar
+from typing import Any, Optional, Self, Type, TypeVar, cast
 from abc import ABC
 from enum import Enum
 
 from amaranth import *
-from amaranth.utils import bits_for, ceil_log2, exact_log2
+from amaranth.utils import bits_for, exact_log2
 
-from transactron.utils import OneHotSwitchDynamic, ValueBundle, logging
+from transactron.utils import ValueBundle, logging
 from transactron import Method, Methods, def_methods, TModule
 from transactron.lib import WideFifo, AsyncMemoryBank
-from transactron.utils.amaranth_ext.functions import and_value, max_value, min_value, or_value, sum_value, popcount
+from transactron.utils.amaranth_ext.functions import and_value, csa_sum_value, max_value, min_value, or_value, popcount
 from transactron.utils.dependencies import ListKey, DependencyContext, SimpleKey
 
 __all__ = [
@@ -31,8 +31,9 @@ __all__ = [
 
 _T_Method = TypeVar("_T_Method", Method, Methods)
 
+type _MetricsTree = tuple[list[str], dict[str, _MetricsTree]]
+
 
-@dataclass_json
 @dataclass(frozen=True)
 class MetricRegisterModel:
     """
@@ -50,13 +51,30 @@ class MetricRegisterModel:
         The bit-width of the register.
     """
 
+    # Declared by hand: `slots=True` would recreate the class, breaking
+    # the frozen `__setattr__` for subclasses adding their own attributes.
+    __slots__ = ("name", "description", "width")
+
     name: str
     description: str
     width: int
 
+    def to_dict(self) -> dict[str, Any]:
+        return {"name": self.name, "description": self.description, "width": self.width}
+
+    @classmethod
+    def from_dict(cls, d: dict[str, Any]) -> Self:
+        return cls(name=d["name"], description=d["description"], width=d["width"])
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict())
+
+    @classmethod
+    def from_json(cls, s: str) -> Self:
+        return cls.from_dict(json.loads(s))
+
 
-@dataclass_json
-@dataclass
+@dataclass(slots=True)
 class MetricModel:
     """
     Provides information about a metric exposed by the circuit. Each metric
@@ -80,6 +98,28 @@ class MetricModel:
     description: str
     regs: dict[str, MetricRegisterModel] = field(default_factory=dict)
 
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "fully_qualified_name": self.fully_qualified_name,
+            "description": self.description,
+            "regs": {name: reg.to_dict() for name, reg in self.regs.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict[str, Any]) -> Self:
+        return cls(
+            fully_qualified_name=d["fully_qualified_name"],
+            description=d["description"],
+            regs={name: MetricRegisterModel.from_dict(reg) for name, reg in d["regs"].items()},
+        )
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict())
+
+    @classmethod
+    def from_json(cls, s: str) -> Self:
+        return cls.from_dict(json.loads(s))
+
 
 class HwMetricRegister(MetricRegisterModel):
     """
@@ -91,6 +131,8 @@ class HwMetricRegister(MetricRegisterModel):
         Amaranth signal representing the value of the register.
     """
 
+    __slots__ = ("value",)
+
     def __init__(self, name: str, width_bits: int, description: str = "", init: int = 0):
         """
         Parameters
@@ -110,14 +152,14 @@ class HwMetricRegister(MetricRegisterModel):
         self.value = Signal(width_bits, init=init, name=name)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class HwMetricsListKey(ListKey["HwMetric"]):
     """DependencyManager key collecting hardware metrics globally as a list."""
 
     pass
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class HwMetricsEnabledKey(SimpleKey[bool]):
     """
     DependencyManager key for enabling hardware metrics. If metrics are disabled,
@@ -128,6 +170,33 @@ class HwMetricsEnabledKey(SimpleKey[bool]):
     default_value = False
 
 
+@dataclass(frozen=True, slots=True)
+class _EpochCounterKey(SimpleKey[tuple[Signal, Elaboratable]]):
+    """DependencyManager key for a free-running cycle counter of a given width,
+    shared by latency measurers. Holds the counter and the module driving it."""
+
+    width: int
+
+    lock_on_get = False
+
+
+def _shared_epoch(m: TModule, owner: Elaboratable, width: int) -> Signal:
+    """Returns the shared epoch counter of the given width, driving it from
+    `owner` if it is the first user of the counter."""
+    dm = DependencyContext.get()
+    key = _EpochCounterKey(width)
+
+    dep = dm.get_optional_dependency(key)
+    if dep is None:
+        dep = (Signal(width, name=f"epoch_{width}"), owner)
+        dm.add_dependency(key, dep)
+
+    epoch, driver = dep
+    if driver is owner:
+        m.d.sync += epoch.eq(epoch + 1)
+    return epoch
+
+
 # TODO: find a cleaner way to make metric methods disappear when disabled.
 class DummyMethod(Method):
     """
@@ -145,11 +214,6 @@ class HwMetric(ABC, MetricModel):
     new types of metrics.
 
     It takes care of registering the metric in the dependency manager.
-
-    Attributes
-    ----------
-    signals: dict[str, Signal]
-        A mapping from a register name to a Signal containing the value of that register.
     """
 
     def __init__(self, fully_qualified_name: str, description: str):
@@ -163,9 +227,9 @@ class HwMetric(ABC, MetricModel):
         """
         super().__init__(fully_qualified_name, description)
 
-        self.signals: dict[str, Signal] = {}
+        self._metrics_enabled = HwMetric.metrics_enabled()
 
-        if HwMetric.metrics_enabled():
+        if self._metrics_enabled:
             # add the metric to the global list of all metrics
             DependencyContext.get().add_dependency(HwMetricsListKey(), self)
         else:
@@ -187,15 +251,22 @@ class HwMetric(ABC, MetricModel):
                 raise RuntimeError(f"Register {reg.name}' is already added to the metric {self.fully_qualified_name}")
 
             self.regs[reg.name] = reg
-            self.signals[reg.name] = reg.value
+
+    @property
+    def signals(self) -> dict[str, Signal]:
+        """A mapping from a register name to a Signal containing the value of that register."""
+        # Only `add_registers` populates `regs`, so all registers are `HwMetricRegister`s.
+        return {name: cast(HwMetricRegister, reg).value for name, reg in self.regs.items()}
 
     @staticmethod
     def metrics_enabled() -> bool:
         return DependencyContext.get().get_dependency(HwMetricsEnabledKey())
 
     @staticmethod
-    def wrap_method(method: _T_Method) -> _T_Method:
-        if not HwMetric.metrics_enabled():
+    def wrap_method(method: _T_Method, enabled: Optional[bool] = None) -> _T_Method:
+        if enabled is None:
+            enabled = HwMetric.metrics_enabled()
+        if not enabled:
 
             if isinstance(method, Method):
                 method.__class__ = DummyMethod
@@ -235,10 +306,10 @@ class HwCounter(Elaboratable, HwMetric):
 
         self.add_registers([self.count])
 
-        self.incr = self.wrap_method(Methods(ways))
+        self.incr = self.wrap_method(Methods(ways), self._metrics_enabled)
 
     def elaborate(self, platform):
-        if not self.metrics_enabled():
+        if not self._metrics_enabled:
             return TModule()
 
         m = TModule()
@@ -319,19 +390,12 @@ class TaggedCounter(Elaboratable, HwMetric):
         values = [value for value, _ in counters_meta]
         self.tag_width = max(bits_for(max(values)), bits_for(min(values)))
 
-        self.one_hot = True
-        negative_values = False
-        for value in values:
-            if value < 0:
-                self.one_hot = False
-                negative_values = True
-                break
-
-            log = ceil_log2(value)
-            if 2**log != value:
-                self.one_hot = False
+        negative_values = any(value < 0 for value in values)
+        self.one_hot = all(value > 0 and value & (value - 1) == 0 for value in values)
 
-        self.incr = self.wrap_method(Methods(ways, i=[("tag", Shape(self.tag_width, signed=negative_values))]))
+        self.incr = self.wrap_method(
+            Methods(ways, i=[("tag", Shape(self.tag_width, signed=negative_values))]), self._metrics_enabled
+        )
 
         self.counters: dict[int, HwMetricRegister] = {}
         for tag_value, name in counters_meta:
@@ -347,19 +411,22 @@ class TaggedCounter(Elaboratable, HwMetric):
         self.add_registers(list(self.counters.values()))
 
     def elaborate(self, platform):
-        if not self.metrics_enabled():
+        if not self._metrics_enabled:
             return TModule()
 
         m = TModule()
 
         runs: dict[int, Signal] = {tag_value: Signal(len(self.incr)) for tag_value in self.counters.keys()}
 
+        if self.one_hot:
+            bit_runs = {exact_log2(tag_value): run for tag_value, run in runs.items()}
+
         @def_methods(m, self.incr)
         def _(k: int, tag):
             if self.one_hot:
-                sorted_tags = sorted(list(self.counters.keys()))
-                for i in OneHotSwitchDynamic(m, tag):
-                    m.d.comb += runs[sorted_tags[i]][k].eq(1)
+                # The tag is one-hot, so each counter's bit of the tag can be used directly.
+                for i, run in bit_runs.items():
+                    m.d.comb += run[k].eq(tag[i])
             else:
                 for tag_value in self.counters.keys():
                     with m.If(tag == tag_value):
@@ -426,7 +493,7 @@ class HwExpHistogram(Elaboratable, HwMetric):
         self.bucket_count = bucket_count
         self.sample_width = sample_width
 
-        self.add = self.wrap_method(Methods(ways, i=[("sample", self.sample_width)]))
+        self.add = self.wrap_method(Methods(ways, i=[("sample", self.sample_width)]), self._metrics_enabled)
 
         self.count = HwMetricRegister("count", registers_width, "the count of events that have been observed")
         self.sum = HwMetricRegister("sum", registers_width, "the total sum of all observed values")
@@ -454,7 +521,7 @@ class HwExpHistogram(Elaboratable, HwMetric):
         self.add_registers([self.count, self.sum, self.max, self.min] + self.buckets)
 
     def elaborate(self, platform):
-        if not self.metrics_enabled():
+        if not self._metrics_enabled:
             return TModule()
 
         m = TModule()
@@ -463,11 +530,17 @@ class HwExpHistogram(Elaboratable, HwMetric):
 
         @def_methods(m, self.add)
         def _(k: int, sample):
-            # todo: perhaps replace with a recursive implementation of the priority encoder
-            bucket_idx = Signal(range(self.sample_width))
-            for i in range(self.sample_width):
-                with m.If(sample[i]):
-                    m.d.av_comb += bucket_idx.eq(i)
+            # suffix_or[i] is set iff any of the bits of the sample from i upwards is set.
+            # Computed as a Kogge-Stone style scan, so its depth is logarithmic in the sample width.
+            suffix_or: list[Value] = [sample[i] for i in range(self.sample_width)]
+            dist = 1
+            while dist < self.sample_width:
+                suffix_or = [
+                    suffix_or[i] | suffix_or[i + dist] if i + dist < self.sample_width else suffix_or[i]
+                    for i in range(self.sample_width)
+                ]
+                dist *= 2
+            suffix_or.append(C(0))
 
             for i in range(len(self.buckets)):
                 if i == 0:
@@ -475,25 +548,31 @@ class HwExpHistogram(Elaboratable, HwMetric):
                     should_incr = sample == 0
                 elif i == self.bucket_count - 1:
                     # The last bucket should count values bigger or equal to 2**(self.bucket_count-1)
-                    should_incr = (bucket_idx >= i - 1) & (sample != 0)
+                    should_incr = suffix_or[min(i - 1, self.sample_width)]
+                elif i - 1 < self.sample_width:
+                    # The most significant set bit of the sample is i-1.
+                    should_incr = sample[i - 1] & ~suffix_or[i]
                 else:
-                    should_incr = (bucket_idx == i - 1) & (sample != 0)
+                    should_incr = C(0)
 
                 m.d.comb += bucket_incrs[i][k].eq(should_incr)
 
-        def sample_or_default(method: Method, default: Value) -> Value:
-            return Mux(method.run, method.data_in.sample, default)
-
-        method_min_samples = list(sample_or_default(m, C((1 << self.sample_width)) - 1) for m in self.add)
-        method_max_samples = list(sample_or_default(m, C(0)) for m in self.add)
+        method_runs: list[Value] = []
+        method_min_samples: list[Value] = []
+        method_max_samples: list[Value] = []
+        for method in self.add:
+            method_runs.append(method.run)
+            method_min_samples.append(Mux(method.run, method.data_in.sample, (1 << self.sample_width) - 1))
+            method_max_samples.append(Mux(method.run, method.data_in.sample, 0))
 
         min_sample = min_value(self.min.value, method_min_samples)
         max_sample = max_value(self.max.value, method_max_samples)
-        sample_sum = sum_value(self.sum.value, method_max_samples)
+        # Samples of methods which did not run are zero, as needed for the sum.
+        sample_sum = csa_sum_value(self.sum.value, method_max_samples)
 
         m.d.sync += self.min.value.eq(min_sample)
         m.d.sync += self.max.value.eq(max_sample)
-        m.d.sync += self.count.value.eq(self.count.value + popcount(Cat(m.run for m in self.add)))
+        m.d.sync += self.count.value.eq(self.count.value + popcount(Cat(method_runs)))
         m.d.sync += self.sum.value.eq(sample_sum)
 
         for i, bucket in enumerate(self.buckets):
@@ -575,8 +654,11 @@ class WideFIFOLatencyMeasurer(Elaboratable):
         # slots_number is rounded up to a multiple of max_count because of WideFifo requirements
         self.slots_number = (slots_number + (max_count - 1)) // max_count * max_count
 
-        self.start = HwMetric.wrap_method(Methods(ways, i=[("count", range(max_start_count + 1))]))
-        self.stop = HwMetric.wrap_method(Methods(ways, i=[("count", range(max_stop_count + 1))]))
+        self._metrics_enabled = HwMetric.metrics_enabled()
+        self.start = HwMetric.wrap_method(
+            Methods(ways, i=[("count", range(max_start_count + 1))]), self._metrics_enabled
+        )
+        self.stop = HwMetric.wrap_method(Methods(ways, i=[("count", range(max_stop_count + 1))]), self._metrics_enabled)
 
         # This bucket count gives us the best possible granularity.
         bucket_count = bits_for(self.max_latency) + 1
@@ -589,7 +671,7 @@ class WideFIFOLatencyMeasurer(Elaboratable):
         )
 
     def elaborate(self, platform):
-        if not HwMetric.metrics_enabled():
+        if not self._metrics_enabled:
             return TModule()
 
         m = TModule()
@@ -605,9 +687,7 @@ class WideFIFOLatencyMeasurer(Elaboratable):
 
         m.submodules.histogram = self.histogram
 
-        epoch = Signal(epoch_width)
-
-        m.d.sync += epoch.eq(epoch + 1)
+        epoch = _shared_epoch(m, self, epoch_width)
 
         @def_methods(m, self.start)
         def _(k: int, count: Value):
@@ -784,8 +864,9 @@ class TaggedLatencyMeasurer(Elaboratable):
         self.slots_number = slots_number
         self.max_latency = max_latency
 
-        self.start = HwMetric.wrap_method(Methods(ways, i=[("slot", range(0, slots_number))]))
-        self.stop = HwMetric.wrap_method(Methods(ways, i=[("slot", range(0, slots_number))]))
+        self._metrics_enabled = HwMetric.metrics_enabled()
+        self.start = HwMetric.wrap_method(Methods(ways, i=[("slot", range(0, slots_number))]), self._metrics_enabled)
+        self.stop = HwMetric.wrap_method(Methods(ways, i=[("slot", range(0, slots_number))]), self._metrics_enabled)
 
         # This bucket count gives us the best possible granularity.
         bucket_count = bits_for(self.max_latency) + 1
@@ -800,7 +881,7 @@ class TaggedLatencyMeasurer(Elaboratable):
         self.log = logging.HardwareLogger(fully_qualified_name)
 
     def elaborate(self, platform):
-        if not HwMetric.metrics_enabled():
+        if not self._metrics_enabled:
             return TModule()
 
         m = TModule()
@@ -822,20 +903,22 @@ class TaggedLatencyMeasurer(Elaboratable):
 
         m.d.sync += slots_taken.eq(or_value(slots_taken_start, and_value(slots_taken_stop, slots_taken)))
 
-        epoch = Signal(epoch_width)
-
-        m.d.sync += epoch.eq(epoch + 1)
+        epoch = _shared_epoch(m, self, epoch_width)
 
         @def_methods(m, self.start)
         def _(k: int, slot: Value):
-            m.d.comb += slots_taken_start[k].eq(1 << slot)
-            self.log.error(m, (slots_taken & (1 << slot)).any(), "taken slot {} taken again", slot)
+            slot_onehot = Signal(self.slots_number)
+            m.d.av_comb += slot_onehot.eq(1 << slot)
+            m.d.comb += slots_taken_start[k].eq(slot_onehot)
+            self.log.error(m, (slots_taken & slot_onehot).any(), "taken slot {} taken again", slot)
             self.slots.write[k](m, addr=slot, data=epoch)
 
         @def_methods(m, self.stop)
         def _(k: int, slot: Value):
-            m.d.comb += slots_taken_stop[k].eq(~(C(1, self.slots_number) << slot))
-            self.log.error(m, ~(slots_taken & (1 << slot)).any(), "free slot {} freed again", slot)
+            slot_onehot = Signal(self.slots_number)
+            m.d.av_comb += slot_onehot.eq(1 << slot)
+            m.d.comb += slots_taken_stop[k].eq(~slot_onehot)
+            self.log.error(m, ~(slots_taken & slot_onehot).any(), "free slot {} freed again", slot)
             ret = self.slots.read[k](m, addr=slot)
             # The result of substracting two unsigned n-bit is a signed (n+1)-bit value,
             # so we need to cast the result and discard the most significant bit.
@@ -921,7 +1004,7 @@ class HardwareMetricsManager:
         metrics = self.get_metrics()
         if metric_name not in metrics:
             raise RuntimeError(f"Couldn't find metric '{metric_name}'")
-        return metrics[metric_name].signals[reg_name]
+        return cast(HwMetricRegister, metrics[metric_name].regs[reg_name]).value
 
     def debug_signals(self) -> ValueBundle:
         """
@@ -929,30 +1012,27 @@ class HardwareMetricsManager:
         """
         metrics = self.get_metrics()
 
-        def rec(metric_names: list[str], depth: int = 1):
+        # A tree of name components. Each node holds the metrics ending at it
+        # and its children keyed by the next name component.
+        root: _MetricsTree = ([], {})
+        for metric in metrics:
+            parts = metric.split(".")
+            node = root
+            for part in parts[:-1]:
+                node = node[1].setdefault(part, ([], {}))
+            node[0].append(metric)
+
+        def rec(node: _MetricsTree, prefix: str = ""):
             bundle: list[ValueBundle] = []
-            components: dict[str, list[str]] = {}
-
-            for metric in metric_names:
-                parts = metric.split(".")
-
-                if len(parts) == depth:
-                    signals = metrics[metric].signals
-                    reg_values = [signals[reg_name] for reg_name in signals]
-
-                    bundle.append({metric: reg_values})
-
-                    continue
-
-                component_prefix = ".".join(parts[:depth])
+            leaves, children = node
 
-                if component_prefix not in components:
-                    components[component_prefix] = []
-                components[component_prefix].append(metric)
+            for metric in leaves:
+                bundle.append({metric: list(metrics[metric].signals.values())})
 
-            for component_name, elements in components.items():
-                bundle.append({component_name: rec(elements, depth + 1)})
+            for part, child in children.items():
+                component_name = prefix + part
+                bundle.append({component_name: rec(child, component_name + ".")})
 
             return bundle
 
-        return {"metrics": rec(list(self.get_metrics().keys()))}
+        return {"metrics": rec(root)}
@@ -1,18 +1,30 @@
+from dataclasses import dataclass
+
 from amaranth import *
 
 from transactron.utils.transactron_helpers import from_method_layout
 from ..core import *
-from ..utils import SrcLoc, get_src_loc, MethodLayout
-from .connectors import Forwarder
+from ..utils import SrcLoc, get_src_loc, MethodLayout, DependencyContext, SimpleKey
+from .connectors import Forwarder, SpillRegister
 from transactron.lib import BasicFifo
 from amaranth.utils import *
 
 __all__ = [
     "ArgumentsToResultsZipper",
     "Serializer",
+    "FifoDepthOverrideKey",
 ]
 
 
+@dataclass(frozen=True, slots=True)
+class FifoDepthOverrideKey(SimpleKey[int]):
+    """
+    DependencyManager key overriding the depth of request FIFOs, e.g. in
+    `Serializer`. Useful for sweeping depths or hunting deadlocks without
+    editing every instantiation.
+    """
+
+
 class ArgumentsToResultsZipper(Elaboratable):
     """Zips arguments used to call method with results, cutting critical path.
 
@@ -77,7 +89,7 @@ class ArgumentsToResultsZipper(Elaboratable):
     def elaborate(self, platform):
         m = TModule()
 
-        fifo = BasicFifo(self.args_layout, depth=2, src_loc=self.src_loc)
+        fifo = SpillRegister(self.args_layout, src_loc=self.src_loc)
         forwarder = Forwarder(self.results_layout, src_loc=self.src_loc)
 
         m.submodules.fifo = fifo
@@ -143,6 +155,7 @@ class Serializer(Elaboratable):
         depth: int
             Number of requests which can be forwarded to server, before server provides first response. Describe
             the resistance of `Serializer` to latency of server in case when server is fully pipelined.
+            Can be overridden globally with `FifoDepthOverrideKey`.
         src_loc: int | SrcLoc
             How many stack frames deep the source location is taken from.
             Alternatively, the source location to use instead of the default.
@@ -168,20 +181,19 @@ class Serializer(Elaboratable):
     def elaborate(self, platform) -> TModule:
         m = TModule()
 
-        pending_requests = BasicFifo(self.id_layout, self.depth, src_loc=self.src_loc)
+        depth = DependencyContext.get().get_optional_dependency(FifoDepthOverrideKey()) or self.depth
+        pending_requests = BasicFifo(self.id_layout, depth, src_loc=self.src_loc)
         m.submodules.pending_requests = pending_requests
 
-        for i in range(self.port_count):
-
-            @def_method(m, self.serialize_in[i])
-            def _(arg):
-                pending_requests.write(m, {"id": i})
-                self.serialized_req_method(m, arg)
+        @def_methods(m, self.serialize_in)
+        def _(i: int, arg):
+            pending_requests.write(m, {"id": i})
+            self.serialized_req_method(m, arg)
 
-            @def_method(m, self.serialize_out[i], ready=(pending_requests.head.id == i))
-            def _():
-                pending_requests.read(m)
-                return self.serialized_resp_method(m)
+        @def_methods(m, self.serialize_out, ready=lambda i: pending_requests.head.id == i)
+        def _(i: int):
+            pending_requests.read(m)
+            return self.serialized_resp_method(m)
 
         self.clear.provide(pending_requests.clear)
 
@@ -1,13 +1,14 @@
 from amaranth import *
 from amaranth.utils import *
 import amaranth.lib.memory as memory
-from amaranth_types import ShapeLike
+from amaranth_types import ShapeLike, ValueLike
 import amaranth_types.memory as amemory
 
 from transactron.utils.amaranth_ext.elaboratables import OneHotMux
+from transactron.utils.amaranth_ext.functions import one_hot_mux
 from transactron.utils.transactron_helpers import from_method_layout, make_layout
 from ..core import *
-from ..utils import SrcLoc, get_src_loc, MultiPriorityEncoder
+from ..utils import SrcLoc, get_src_loc
 from typing import Optional
 from transactron.utils import LayoutList, MethodLayout
 
@@ -42,6 +43,7 @@ class MemoryBank(Elaboratable):
         granularity: Optional[int] = None,
         transparent: bool = False,
         read_on_resp: bool = False,
+        buffered: bool = True,
         read_ports: int = 1,
         write_ports: int = 1,
         memory_type: amemory.AbstractMemoryConstructor[ShapeLike, Value] = memory.Memory,
@@ -65,6 +67,12 @@ class MemoryBank(Elaboratable):
         read_on_resp: bool
             If true, reads return the value present in memory at response time. If false, the value at request
             time is returned.
+        buffered: bool
+            If true (the default), each read port can hold two responses, so a second read request can be
+            issued before the first response is read. If false, the overflow buffer is omitted and a read
+            request is only ready when there is no pending response, or it is read in the same cycle.
+            In that case `read_req` readiness depends combinationally on `read_resp` being run, so `read_resp`
+            is scheduled before `read_req`, and both cannot be called from a single transaction (like `Pipe`).
         read_ports: int
             Number of read ports.
         write_ports: int
@@ -79,6 +87,7 @@ class MemoryBank(Elaboratable):
         self.granularity = granularity
         self.transparent = transparent
         self.read_on_resp = read_on_resp
+        self.buffered = buffered
         self.reads_ports = read_ports
         self.writes_ports = write_ports
         self.memory_type = memory_type
@@ -152,10 +161,11 @@ class MemoryBank(Elaboratable):
             # The first result is stored in the overflow buffer, the second - in the read value buffer of the memory.
             # If the responses are always read as they arrive, overflow is never written and no stalls occur.
 
-            with m.If(read_output_valid[i] & ~overflow_valid[i] & self.read_req[i].run & ~self.read_resp[i].run):
-                m.d.sync += overflow_valid[i].eq(1)
-                m.d.sync += overflow_addr[i].eq(read_output_addr[i])
-                m.d.sync += overflow_data[i].eq(read_output_next[i])
+            if self.buffered:
+                with m.If(read_output_valid[i] & ~overflow_valid[i] & self.read_req[i].run & ~self.read_resp[i].run):
+                    m.d.sync += overflow_valid[i].eq(1)
+                    m.d.sync += overflow_addr[i].eq(read_output_addr[i])
+                    m.d.sync += overflow_data[i].eq(read_output_next[i])
 
         @def_methods(m, self.read_resp, lambda i: read_output_valid[i] | overflow_valid[i])
         def _(i: int):
@@ -184,13 +194,22 @@ class MemoryBank(Elaboratable):
             if self.read_on_resp:
                 m.d.comb += read_port[i].addr.eq(read_output_addr[i])
             else:
-                m.d.comb += read_port[i].en.eq(0)  # because the init value is 1
+                # The init value is 1, so the port is enabled only by read requests.
+                m.d.comb += read_port[i].en.eq(self.read_req[i].run)
 
-        @def_methods(m, self.read_req, lambda i: ~overflow_valid[i])
+        if not self.buffered:
+            for i in range(self.reads_ports):
+                self.read_resp[i].schedule_before(self.read_req[i])  # to avoid combinational loops
+
+        def read_req_ready(i: int) -> ValueLike:
+            if self.buffered:
+                return ~overflow_valid[i]
+            return ~read_output_valid[i] | self.read_resp[i].run
+
+        @def_methods(m, self.read_req, read_req_ready)
         def _(i: int, addr):
             m.d.sync += read_output_valid[i].eq(1)
             m.d.sync += read_output_addr[i].eq(addr)
-            m.d.comb += read_port[i].en.eq(1)
             if self.read_on_resp:
                 m.d.comb += read_port[i].addr.eq(addr)
             else:
@@ -220,8 +239,12 @@ class ContentAddressableMemory(Elaboratable):
     which value will be read.
 
 
+    In ternary mode, each entry is pushed with a `mask` of the address bits which are ignored
+    when comparing, so that a single entry can match many keys.
+
     .. warning::
         Pushing the value with index already present in CAM is an undefined behaviour.
+        In ternary mode, this extends to entries whose masked addresses overlap.
 
     Attributes
     ----------
@@ -235,7 +258,9 @@ class ContentAddressableMemory(Elaboratable):
         Inserts new data.
     """
 
-    def __init__(self, address_layout: MethodLayout, data_layout: MethodLayout, entries_number: int):
+    def __init__(
+        self, address_layout: MethodLayout, data_layout: MethodLayout, entries_number: int, *, ternary: bool = False
+    ):
         """
         Parameters
         ----------
@@ -245,62 +270,94 @@ class ContentAddressableMemory(Elaboratable):
             The layout of the data.
         entries_number : int
             The number of slots to create in memory.
+        ternary : bool
+            If true, `push` takes an additional `mask` argument with the layout of the address.
+            Set bits of the mask mark address bits which are ignored by lookups. False by default.
         """
         self.address_layout = from_method_layout(address_layout)
         self.data_layout = from_method_layout(data_layout)
         self.entries_number = entries_number
+        self.ternary = ternary
+
+        push_layout = [("addr", self.address_layout), ("data", self.data_layout)]
+        if self.ternary:
+            push_layout.append(("mask", self.address_layout))
 
         self.read = Method(i=[("addr", self.address_layout)], o=[("data", self.data_layout), ("not_found", 1)])
         self.remove = Method(i=[("addr", self.address_layout)])
-        self.push = Method(i=[("addr", self.address_layout), ("data", self.data_layout)])
+        self.push = Method(i=push_layout)
         self.write = Method(i=[("addr", self.address_layout), ("data", self.data_layout)], o=[("not_found", 1)])
 
     def elaborate(self, platform) -> TModule:
         m = TModule()
 
-        address_array = Array(
-            [Signal(self.address_layout, name=f"address_array_{i}") for i in range(self.entries_number)]
-        )
-        data_array = Array([Signal(self.data_layout, name=f"data_array_{i}") for i in range(self.entries_number)])
+        address_array = [Signal(self.address_layout, name=f"address_array_{i}") for i in range(self.entries_number)]
+        data_array = [Signal(self.data_layout, name=f"data_array_{i}") for i in range(self.entries_number)]
         valids = Signal(self.entries_number, name="valids")
 
-        m.submodules.encoder_read = encoder_read = MultiPriorityEncoder(self.entries_number, 1)
-        m.submodules.encoder_write = encoder_write = MultiPriorityEncoder(self.entries_number, 1)
-        m.submodules.encoder_push = encoder_push = MultiPriorityEncoder(self.entries_number, 1)
-        m.submodules.encoder_remove = encoder_remove = MultiPriorityEncoder(self.entries_number, 1)
-        m.d.top_comb += encoder_push.input.eq(~valids)
+        # Matching entries are selected with one-hot masks of the lowest set bit,
+        # so no entry index needs to be encoded and then decoded again.
+        def lowest_set(mask: Value) -> Value:
+            return mask & (~mask + 1)
 
-        @def_method(m, self.push, ready=~valids.all())
-        def _(addr, data):
-            id = Signal(range(self.entries_number), name="id_push")
-            m.d.top_comb += id.eq(encoder_push.outputs[0])
-            m.d.sync += address_array[id].eq(addr)
-            m.d.sync += data_array[id].eq(data)
-            m.d.sync += valids.bit_select(id, 1).eq(1)
+        if self.ternary:
+            ignore_array = [Signal(self.address_layout, name=f"ignore_array_{i}") for i in range(self.entries_number)]
+
+        def match_mask(addr: Value) -> Value:
+            if self.ternary:
+                matches = [
+                    ((Value.cast(addr) ^ Value.cast(stored_addr)) & ~Value.cast(ignore)) == 0
+                    for stored_addr, ignore in zip(address_array, ignore_array)
+                ]
+            else:
+                matches = [addr == stored_addr for stored_addr in address_array]
+            return Cat(matches) & valids
+
+        # The slot for the next push and the full flag are registered, computed
+        # from the next value of `valids`, to keep wide reductions off the push path.
+        push_set = Signal(self.entries_number, name="push_set")
+        rm_clear = Signal(self.entries_number, name="rm_clear")
+        valids_next = Signal(self.entries_number, name="valids_next")
+        push_mask = Signal(self.entries_number, init=1, name="push_mask")
+        full = Signal(name="full")
+
+        m.d.comb += valids_next.eq((valids | push_set) & ~rm_clear)
+        m.d.sync += valids.eq(valids_next)
+        m.d.sync += push_mask.eq(lowest_set(~valids_next))
+        m.d.sync += full.eq(valids_next.all())
+
+        @def_method(m, self.push, ready=~full)
+        def _(arg):
+            m.d.comb += push_set.eq(push_mask)
+            for i in range(self.entries_number):
+                with m.If(push_mask[i]):
+                    m.d.sync += address_array[i].eq(arg.addr)
+                    m.d.sync += data_array[i].eq(arg.data)
+                    if self.ternary:
+                        m.d.sync += ignore_array[i].eq(arg.mask)
 
         @def_method(m, self.write)
         def _(addr, data):
             write_mask = Signal(self.entries_number, name="write_mask")
-            m.d.top_comb += write_mask.eq(Cat([addr == stored_addr for stored_addr in address_array]) & valids)
-            m.d.top_comb += encoder_write.input.eq(write_mask)
-            with m.If(write_mask.any()):
-                m.d.sync += data_array[encoder_write.outputs[0]].eq(data)
+            m.d.top_comb += write_mask.eq(match_mask(addr))
+            write_first = lowest_set(write_mask)
+            for i in range(self.entries_number):
+                with m.If(write_first[i]):
+                    m.d.sync += data_array[i].eq(data)
             return {"not_found": ~write_mask.any()}
 
         @def_method(m, self.read)
         def _(addr):
             read_mask = Signal(self.entries_number, name="read_mask")
-            m.d.top_comb += read_mask.eq(Cat([addr == stored_addr for stored_addr in address_array]) & valids)
-            m.d.top_comb += encoder_read.input.eq(read_mask)
-            return {"data": data_array[encoder_read.outputs[0]], "not_found": ~read_mask.any()}
+            m.d.top_comb += read_mask.eq(match_mask(addr))
+            data = one_hot_mux(read_mask, data_array, priority=True, assert_one_hot=False)
+            return {"data": data, "not_found": ~read_mask.any()}
 
         @def_method(m, self.remove)
         def _(addr):
             rm_mask = Signal(self.entries_number, name="rm_mask")
-            m.d.top_comb += rm_mask.eq(Cat([addr == stored_addr for stored_addr in address_array]) & valids)
-            m.d.top_comb += encoder_remove.input.eq(rm_mask)
-            with m.If(rm_mask.any()):
-                m.d.sync += valids.bit_select(encoder_remove.outputs[0], 1).eq(0)
+            m.d.top_comb += rm_mask.eq(match_mask(addr))
+            m.d.comb += rm_clear.eq(lowest_set(rm_mask))
 
         return m
 
@@ -67,9 +67,11 @@ class StreamSink(wiring.Component):
 
         @def_method(m, self.read, ready=self.i.valid)
         def _():
-            m.d.comb += self.i.ready.eq(1)
             return {"data": self.i.payload}
 
+        # The payload is consumed only by `read`, `peek` shares the same data.
+        m.d.comb += self.i.ready.eq(self.read.run)
+
         return m
 
 
@@ -83,6 +85,11 @@ class StreamSource(wiring.Component):
     - `valid` remains high until the consumer accepts the data
     - The method can accept new data only when the buffer is empty or being emptied
 
+    With `bypass` enabled, written data is presented on the stream in the same
+    cycle, and only buffered if the consumer is not ready. The method is then
+    ready only when the buffer is empty, so that `valid` does not depend on
+    `ready`.
+
     Attributes
     ----------
     o: amaranth.lib.stream.Interface, out
@@ -94,12 +101,15 @@ class StreamSource(wiring.Component):
     o: stream.Interface
     write: Method
 
-    def __init__(self, shape: ShapeLike, *, src_loc: int | SrcLoc = 0):
+    def __init__(self, shape: ShapeLike, *, bypass: bool = False, src_loc: int | SrcLoc = 0):
         """
         Parameters
         ----------
         shape: ShapeLike
             The shape of the data in the stream.
+        bypass: bool
+            If true, data is passed to the stream in the same cycle it is
+            written, instead of being registered first. False by default.
         src_loc: int | SrcLoc
             How many stack frames deep the source location is taken from.
             Alternatively, the source location to use instead of the default.
@@ -110,6 +120,8 @@ class StreamSource(wiring.Component):
             }
         )
 
+        self.bypass = bypass
+
         method_layout = data_layout(shape)
 
         src_loc = get_src_loc(src_loc)
@@ -118,6 +130,26 @@ class StreamSource(wiring.Component):
     def elaborate(self, platform):
         m = TModule()
 
+        if self.bypass:
+            buffer = Signal.like(self.o.payload)
+            buffer_valid = Signal()
+
+            m.d.comb += self.o.payload.eq(buffer)
+            m.d.comb += self.o.valid.eq(buffer_valid)
+
+            with m.If(self.o.ready):
+                m.d.sync += buffer_valid.eq(0)
+
+            @def_method(m, self.write, ready=~buffer_valid)
+            def _(data):
+                m.d.comb += self.o.payload.eq(data)
+                m.d.comb += self.o.valid.eq(1)
+                with m.If(~self.o.ready):
+                    m.d.sync += buffer.eq(data)
+                    m.d.sync += buffer_valid.eq(1)
+
+            return m
+
         # Method is ready when buffer is empty or being emptied this cycle
         @def_method(m, self.write, ready=(~self.o.valid | self.o.ready))
         def _(data):
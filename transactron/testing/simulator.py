@@ -101,8 +101,8 @@ async def tick(ctx: SimulatorContext, cycle_cnt: int = 1):
     """
     Waits for the given number of cycles.
     """
-    for _ in range(cycle_cnt):
-        await ctx.tick()
+    if cycle_cnt > 0:
+        await ctx.tick().repeat(cycle_cnt)
 
 
 async def random_wait(ctx: SimulatorContext, max_cycle_cnt: int, *, min_cycle_cnt: int = 0):
@@ -1,4 +1,5 @@
 from collections.abc import Generator, Iterable
+from functools import cached_property
 from amaranth import *
 from amaranth.lib.data import View, StructLayout
 from amaranth.sim._async import SimulatorContext, TestbenchContext
@@ -102,14 +103,7 @@ class CallTrigger:
             if data is not None:
                 tbio.call_init(self.sim, data)
 
-        def layout_for(tbio: TestbenchIO):
-            return StructLayout({"outputs": tbio.adapter.data_out.shape(), "done": 1})
-
-        trigger = (
-            self.sim.tick()
-            .sample(*(View(layout_for(tbio), Cat(tbio.outputs, tbio.done)) for tbio, _ in only_calls))
-            .sample(*only_values)
-        )
+        trigger = self.sim.tick().sample(*(tbio.outputs_done for tbio, _ in only_calls)).sample(*only_values)
         _, _, *results = yield from trigger.__await__()
 
         for tbio, data in only_calls:
@@ -161,6 +155,11 @@ class TestbenchIO(Elaboratable):
     def outputs(self):
         return self.adapter.data_out
 
+    @cached_property
+    def outputs_done(self) -> View[StructLayout]:
+        layout = StructLayout({"outputs": self.adapter.data_out.shape(), "done": 1})
+        return View(layout, Cat(self.adapter.data_out, self.adapter.done))
+
     def set_inputs(self, sim: SimulatorContext, data):
         sim.set(self.adapter.data_in, data)
 
@@ -9,7 +9,7 @@ from transactron.utils.dependencies import DependencyContext, SimpleKey
 __all__ = ["TicksKey", "make_tick_count_process"]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TicksKey(SimpleKey[Signal]):
     pass
 
@@ -5,6 +5,7 @@ from amaranth_types import AbstractInterface, AbstractSignature, FlatShapeLike
 from abc import ABCMeta
 from typing import TYPE_CHECKING, Mapping, Self, final, overload
 from dataclasses import dataclass
+from functools import cached_property
 
 __all__ = [
     "CIn",
@@ -129,7 +130,7 @@ class ComponentInterface(AbstractComponentInterface):
                 super().__init__({bus: In(ExampleInterface(2).signature)})
     """
 
-    @property
+    @cached_property
     def signature(self) -> AbstractSignature:
         """Amaranth lib.wiring `Signature` constructed from defined `ComponentInterface` attributes."""
         return Signature(self._to_members_list())
@@ -170,7 +171,7 @@ class FlippedComponentInterface[T: ComponentInterface](AbstractComponentInterfac
     def __getattr__(self, name: str):
         return getattr(self._base, name)
 
-    @property
+    @cached_property
     def signature(self) -> AbstractSignature:
         """Amaranth lib.wiring `Signature` constructed from defined `ComponentInterface` attributes."""
         return self._base.signature.flip()
@@ -23,8 +23,10 @@ __all__ = [
     "const_of",
     "binary_tree_reduce",
     "sum_value",
+    "csa_sum_value",
     "or_value",
     "and_value",
+    "xor_value",
     "generic_min_value",
     "min_value",
     "max_value",
@@ -174,6 +176,30 @@ def sum_value(*values: ValueBundle):
     return binary_tree_reduce(*values, neutral=C(0), operator=operator.add)
 
 
+def csa_sum_value(*values: ValueBundle) -> Value:
+    """
+    Sum of unsigned values using a tree of carry-save adders.
+
+    Each level reduces groups of three terms to two using constant-depth 3:2 compressors.
+    Only the final two terms are added with a carry-propagating adder.
+    """
+    terms = [Value.cast(value).as_unsigned() for value in flatten_signals(values)]
+    if not terms:
+        return C(0)
+
+    width = max(len(term) for term in terms) + ceil_log2(len(terms))
+
+    while len(terms) > 2:
+        next_terms = []
+        for a, b, c in zip(terms[0::3], terms[1::3], terms[2::3]):
+            next_terms.append((a ^ b ^ c)[:width])
+            next_terms.append((((a & b) | (a & c) | (b & c)) << 1)[:width])
+        next_terms += terms[len(terms) - len(terms) % 3 :]
+        terms = next_terms
+
+    return sum(terms[1:], terms[0])[:width]
+
+
 def or_value(*values: ValueBundle):
     return binary_tree_reduce(*values, neutral=C(0), operator=operator.or_)
 
@@ -182,6 +208,10 @@ def and_value(*values: ValueBundle):
     return binary_tree_reduce(*values, neutral=C(-1), operator=operator.and_)
 
 
+def xor_value(*values: ValueBundle):
+    return binary_tree_reduce(*values, neutral=C(0), operator=operator.xor)
+
+
 def generic_min_value(*values: ValueBundle, operator: Callable[[Value, Value], Value]) -> Value:
     def binary_min(v1: Value, v2: Value):
         return Mux(operator(v1, v2), v1, v2)
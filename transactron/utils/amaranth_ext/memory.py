@@ -8,6 +8,7 @@ from collections.abc import Iterable
 
 from transactron.utils.amaranth_ext.elaboratables import OneHotMux
 from transactron.utils.amaranth_ext.coding import Encoder
+from transactron.utils.amaranth_ext.functions import xor_value
 from transactron.core import TModule
 
 from .. import get_src_loc
@@ -31,7 +32,8 @@ class ReadPort:
         src_loc=0,
     ):
         self.src_loc = get_src_loc(src_loc)
-        self.transparent_for = transparent_for
+        # Only used for membership tests against write ports, which hash by identity.
+        self.transparent_for = frozenset(transparent_for)
         self.en = Signal(init=1)
         self.addr = Signal(range(memory.depth))
         self.data = Signal(memory.shape)
@@ -206,8 +208,9 @@ class MultiportXORMemory(BaseMultiportMemory):
 
         self._frozen = True
 
-        write_xors = [Value.cast(0) for _ in self.write_ports]
-        read_xors = [Value.cast(0) for _ in self.read_ports]
+        # XOR terms are collected first and reduced as balanced trees.
+        write_xor_terms: list[list[Value]] = [[] for _ in self.write_ports]
+        read_xor_terms: list[list[Value]] = [[] for _ in self.read_ports]
 
         write_regs_addr = [Signal(range(self.depth)) for _ in self.write_ports]
         write_regs_data = [Signal(self.shape) for _ in self.write_ports]
@@ -216,7 +219,7 @@ class MultiportXORMemory(BaseMultiportMemory):
         # feedback ports
         for index, write_port in enumerate(self.write_ports):
             m.d.sync += [write_regs_data[index].eq(write_port.data), write_regs_addr[index].eq(write_port.addr)]
-            write_xors[index] ^= write_regs_data[index]
+            write_xor_terms[index].append(write_regs_data[index])
             for i in range(len(self.write_ports) - 1):
                 mem = memory.Memory(
                     shape=self.shape, depth=self.depth, init=[], attrs=self.attrs, src_loc_at=self.src_loc
@@ -227,7 +230,7 @@ class MultiportXORMemory(BaseMultiportMemory):
                 physical_read_port = mem.read_port(transparent_for=[physical_write_port])
 
                 idx = i + 1 if i >= index else i
-                write_xors[idx] ^= physical_read_port.data
+                write_xor_terms[idx].append(physical_read_port.data)
 
                 m.d.comb += [physical_read_port.en.eq(1), physical_read_port.addr.eq(self.write_ports[idx].addr)]
 
@@ -239,7 +242,7 @@ class MultiportXORMemory(BaseMultiportMemory):
         # real read ports
         for index, write_port in enumerate(self.write_ports):
             write_xor = Signal(self.shape)
-            m.d.comb += [write_xor.eq(write_xors[index])]
+            m.d.comb += [write_xor.eq(xor_value(write_xor_terms[index]))]
 
             for i in range(len(self.write_ports) - 1):
                 mem_name = f"memory_{index}_{i}"
@@ -284,20 +287,22 @@ class MultiportXORMemory(BaseMultiportMemory):
                 )
 
                 if write_port in self.read_ports[idx].transparent_for:
-                    read_xors[idx] ^= Mux(
-                        (read_addr_bypass == write_regs_addr[index]) & r_write_port.en,
-                        write_xor,
-                        double_stage_bypass,
+                    read_xor_terms[idx].append(
+                        Mux(
+                            (read_addr_bypass == write_regs_addr[index]) & r_write_port.en,
+                            write_xor,
+                            double_stage_bypass,
+                        )
                     )
                 else:
-                    read_xors[idx] ^= double_stage_bypass
+                    read_xor_terms[idx].append(double_stage_bypass)
 
                 m.d.comb += [port.addr.eq(self.read_ports[idx].addr), port.en.eq(self.read_ports[idx].en)]
 
         for index, port in enumerate(self.read_ports):
             sync_data = Signal.like(port.data)
             m.d.sync += sync_data.eq(port.data)
-            m.d.comb += [port.data.eq(Mux(read_en_bypass[index], read_xors[index], sync_data))]
+            m.d.comb += [port.data.eq(Mux(read_en_bypass[index], xor_value(read_xor_terms[index]), sync_data))]
 
         return m
 
@@ -540,10 +545,10 @@ class MultiportILVTMemory(BaseMultiportMemory):
             else:
                 switch = ilvt_read_ports[index].data
 
-            with m.Switch(switch):
-                for value in range(len(self.write_ports)):
-                    with m.Case(value):
-                        m.d.comb += [bank_data.eq(m.submodules[f"bank_{value}"].read_ports[index].data)]
+            bank_read_data = Array(
+                m.submodules[f"bank_{i}"].read_ports[index].data for i in range(len(self.write_ports))
+            )
+            m.d.comb += bank_data.eq(bank_read_data[switch])
 
             mux_inputs = [
                 ((write_addr_bypass[idx] == read_addr_bypass) & write_en_bypass[idx], write_data_bypass[idx])
@@ -25,6 +25,8 @@ class DependencyKey[T, U](ABC):
         action would cause raising `KeyError`.
     """
 
+    __slots__ = ()
+
     @abstractmethod
     def combine(self, data: list[T]) -> U:
         """Combine multiple dependencies with the same key.
@@ -65,6 +67,8 @@ class SimpleKey[T](DependencyKey[T, T]):
         enable it `empty_valid` must be True.
     """
 
+    __slots__ = ()
+
     default_value: T
 
     def combine(self, data: list[T]) -> T:
@@ -82,6 +86,8 @@ class ListKey[T](DependencyKey[T, list[T]]):
     and dependecies. Provides list of dependencies.
     """
 
+    __slots__ = ()
+
     empty_valid = True
 
     def combine(self, data: list[T]) -> list[T]:
@@ -67,7 +67,7 @@ class LogRecord(LogRecordInfo):
     """Amaranth signals that will be used to format the message."""
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class LogKey(ListKey[LogRecord]):
     pass
 
@@ -2,7 +2,8 @@ import os
 import sys
 from contextlib import contextmanager
 from typing import Optional, Any, Concatenate, TypeGuard
-from collections.abc import Callable, Mapping, Sequence
+from collections.abc import Callable, Collection, Mapping, Sequence
+from functools import cache
 from .typing import ROGraph, GraphCC, MethodLayout, MethodStruct, LayoutList, LayoutListField
 from amaranth_types import SrcLoc, ShapeLike
 from inspect import Parameter, signature
@@ -19,6 +20,7 @@ __all__ = [
     "silence_mustuse",
     "get_caller_class_name",
     "def_helper",
+    "def_helper_takes_arg",
     "method_def_helper",
     "mock_def_helper",
     "async_mock_def_helper",
@@ -89,7 +91,13 @@ def has_first_param[
     )
 
 
-def def_helper[T, U](description, func: Callable[..., T], tp: type[U], arg: U, /, **kwargs) -> T:
+def def_helper_takes_arg[U](description, func: Callable, tp: type[U], kw_names: Collection[str]) -> bool:
+    """Checks how `def_helper` passes arguments to `func`.
+
+    Returns true if `func` takes a single `arg` parameter, false if it takes
+    a subset of `kw_names` as named parameters. The result depends only on
+    `func` and `kw_names`, so it can be saved when `func` is called repeatedly.
+    """
     try:
         parameters = signature(func).parameters
     except ValueError:
@@ -99,13 +107,20 @@ def def_helper[T, U](description, func: Callable[..., T], tp: type[U], arg: U, /
         n for n, p in parameters.items() if p.kind in {Parameter.POSITIONAL_OR_KEYWORD, Parameter.KEYWORD_ONLY}
     )
     if len(parameters) == 1 and has_first_param(func, "arg", tp):
-        return func(arg)
-    elif kw_parameters <= kwargs.keys():
-        return func(**kwargs)
+        return True
+    elif kw_parameters <= set(kw_names):
+        return False
     else:
         raise TypeError(f"Invalid {description}: {func}")
 
 
+def def_helper[T, U](description, func: Callable[..., T], tp: type[U], arg: U, /, **kwargs) -> T:
+    if def_helper_takes_arg(description, func, tp, kwargs.keys()):
+        return func(arg)
+    else:
+        return func(**kwargs)
+
+
 def mock_def_helper[T](tb, func: Callable[..., T], arg: Mapping[str, Any]) -> T:
     return def_helper(f"mock definition for {tb}", func, Mapping[str, Any], arg, **arg)
 
@@ -171,11 +186,37 @@ def extend_layout(layout: StructLayout, *fields: LayoutListField) -> StructLayou
     return StructLayout(layout.members | from_method_layout(fields).members)
 
 
+@dataclasses.dataclass(frozen=True)
+class _FrozenLayoutList:
+    # A distinct type, so that a nested layout list is never confused with a tuple shape.
+    fields: tuple[tuple[str, Any], ...]
+
+
+def _freeze_layout_list(layout: LayoutList) -> _FrozenLayoutList:
+    return _FrozenLayoutList(tuple((k, _freeze_layout_list(v) if isinstance(v, list) else v) for k, v in layout))
+
+
+@cache
+def _from_frozen_layout_list(frozen: _FrozenLayoutList) -> StructLayout:
+    return StructLayout(
+        {k: _from_frozen_layout_list(v) if isinstance(v, _FrozenLayoutList) else v for k, v in frozen.fields}
+    )
+
+
 def from_method_layout(layout: MethodLayout) -> StructLayout:
     if isinstance(layout, StructLayout):
         return layout
-    else:
-        return StructLayout({k: from_layout_field(v) for k, v in layout})
+
+    # The layout can be a one-shot iterable, and it is walked twice on the fallback path.
+    fields = list(layout)
+
+    # Layouts are immutable, so equal layout lists can share a single `StructLayout`.
+    try:
+        frozen = _freeze_layout_list(fields)
+        hash(frozen)
+    except TypeError:
+        return StructLayout({k: from_layout_field(v) for k, v in fields})
+    return _from_frozen_layout_list(frozen)
 
 
 def dataclass_asdict(obj: Any) -> dict[str, Any]: